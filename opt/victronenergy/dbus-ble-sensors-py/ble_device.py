@@ -1,13 +1,83 @@
 from __future__ import annotations
 import os
-import inspect
+import math
+import codecs
 import logging
+import struct
 import importlib.util
 import dbus
+from dataclasses import dataclass
 from functools import partial
 from dbus_ble_service import DbusBleService
 from dbus_role_service import DbusRoleService
-from ble_role import BleRole
+from ble_role import BleRole, _validate_settings_alarms
+
+_utf8_decode = codecs.utf_8_decode
+
+# Compiled reg kinds, used for parsing dispatch
+_KIND_BOOL = 0
+_KIND_INT = 1
+_KIND_STR = 2
+_KIND_BIT = 3  # Boolean held by a single bit, without post processing
+
+# Default data length in bits, by data type
+_TYPE_BITS = {
+    dbus.types.Boolean: 8,
+    dbus.types.Byte: 8,
+    dbus.types.Int16: 16,
+    dbus.types.UInt16: 16,
+    dbus.types.Int32: 32,
+    dbus.types.UInt32: 32,
+    dbus.types.Int64: 64,
+    dbus.types.UInt64: 64,
+}
+
+# Parsing kind, by data type
+_TYPE_KIND = {
+    dbus.types.Boolean: _KIND_BOOL,
+    dbus.types.Byte: _KIND_INT,
+    dbus.types.Int16: _KIND_INT,
+    dbus.types.UInt16: _KIND_INT,
+    dbus.types.Int32: _KIND_INT,
+    dbus.types.UInt32: _KIND_INT,
+    dbus.types.Int64: _KIND_INT,
+    dbus.types.UInt64: _KIND_INT,
+    dbus.types.Double: _KIND_INT,
+    dbus.types.String: _KIND_STR,
+}
+
+# Struct format characters of byte aligned integers (signed), by length in bits
+_STRUCT_FORMATS = {8: 'b', 16: 'h', 32: 'i', 64: 'q'}
+
+
+@dataclass(slots=True, frozen=True, eq=False)
+class CompiledReg:
+    """
+    Reg definition resolved once at configuration time, so that parsing does not have to look it up on each
+    advertisement. Cf. 'regs' in BleDevice.info for fields description.
+    Compared and hashed by identity, as it is used as key of values parsed once for several roles.
+    """
+    name: str
+    kind: int
+    offset: int
+    size: int           # Length in bytes, None if it can not be computed
+    end: int            # Offset following the data, None if size can not be computed
+    bits: int
+    byteorder: str
+    signed: bool
+    mask: int
+    shift: int
+    bits_mask: int      # Mask trimming shifted value on bits size
+    bit_byte: int       # For bit kind, offset of the byte holding the bit
+    bit: int            # For bit kind, position of the bit in its byte
+    unpack: callable    # Bound struct unpack_from method for byte aligned data, None otherwise
+    scale: float        # Divisor, None if not set or replaced by scale_recip
+    scale_recip: float  # Multiplier, set instead of scale for powers of two and 1/n scales
+    bias: float
+    xlate: callable
+    check_invalid: bool
+    inval: any
+    roles: tuple        # Roles the data is published to, already resolved
 
 
 class BleDevice(object):
@@ -18,13 +88,20 @@ class BleDevice(object):
         - must overload class variable 'MANUFACTURER_ID' and 'configure' method with self.info.update
     method to overload entries as described in code.
         - can overload 'update_data' method to add post parsing custom logic
+        - should be declared in their module with a 'DEVICE_CLASS' variable
+        - should declare empty '__slots__' if they do not add attributes, as this class does
     """
 
+    __slots__ = ('_role_services', '_plog', 'info', '_compiled_regs', '_regs_by_role', '_ble_service',
+                 '_handle_plan', '_last_manufacturer_data')
+
     _ALLOWED_TYPES = [dbus.types.Boolean, dbus.types.Byte, dbus.types.Int16, dbus.types.UInt16, dbus.types.Int32,
                       dbus.types.UInt32, dbus.types.Int64, dbus.types.UInt64, dbus.types.Double, dbus.types.String]
 
     _SIGNED_TYPES = [dbus.types.Int16, dbus.types.Int32, dbus.types.Int64]
 
+    _ALLOWED_FLAGS = frozenset(['REG_FLAG_BIG_ENDIAN', 'REG_FLAG_INVALID'])
+
     MANUFACTURER_ID = 0  # To be overloaded in children classes: int, ble manufacturer id
 
     # Dict of devices classes, key is manufacturer id
@@ -33,6 +110,11 @@ class BleDevice(object):
     def __init__(self, dev_mac: str, dev_name: str):
         self._role_services: dict = {}
         self._plog: str = None
+        self._compiled_regs: list = None
+        self._regs_by_role: dict[str, tuple[CompiledReg, ...]] = None
+        self._ble_service: DbusBleService = None
+        self._handle_plan: tuple = ()
+        self._last_manufacturer_data: bytes = None
 
         # Mandatory fields must be overloaded by subclasses, optional ones can be left as is.
         self.info = {
@@ -56,13 +138,21 @@ class BleDevice(object):
                                         # - xlate  : custom method to be executed after data parsing
                                         # - inval  : if flag REG_FLAG_INVALID is set, value that invalidates the data
                                         # - roles  : list of role names concerned by the data. If not defined, all roles, if contains None, data is ignored.
+                                        # Regs are compiled into CompiledReg when configuration is checked, later changes are ignored.
             'settings': [],             # Optional,  list of dict, settings that could be set through UI
             'alarms': [],               # Optional,  list of dict, raisable alarms, defined with :
                                         # - name   : Name of the alarm
-                                        # - update : method returning, depending on which alarm it is:
+                                        # - update : method called with a snapshot of the role service values, returning, depending
+                                        #            on which alarm it is:
                                         #       - 0 : no alarm
                                         #       - 1 : alarm or warning
                                         #       - 2 : alarm
+                                        # - inputs : optional, paths of all the values the update method depends on. If set, the
+                                        #            update is skipped when none of them changed. Not for methods with internal state.
+                                        # The snapshot is not the role service: values read with snapshot[path] are cached and
+                                        # shared by alarms, snapshot[path] = value writes through and resets the cache. Other
+                                        # attributes, like _set_value, are the role service ones and bypass it: values they
+                                        # change are not seen by reads already cached.
         }
 
     def configure(self, manufacturer_data: bytes):
@@ -82,25 +172,32 @@ class BleDevice(object):
 
     @staticmethod
     def load_classes(execution_path: str):
+        # Classes are loaded once
+        if BleDevice.DEVICE_CLASSES:
+            return
         device_classes_prefix = f"{os.path.splitext(os.path.basename(__file__))[0]}_"
 
         # Loading manufacturer specific classes
-        for filename in os.listdir(os.path.dirname(execution_path)):
-            if filename.startswith(device_classes_prefix) and filename.endswith('.py'):
-                file_path = os.path.join(os.path.dirname(execution_path), filename)
-                module_name = os.path.splitext(filename)[0]
+        with os.scandir(os.path.dirname(execution_path)) as entries:
+            for entry in entries:
+                if not (entry.name.startswith(device_classes_prefix) and entry.name.endswith('.py')):
+                    continue
+                module_name = os.path.splitext(entry.name)[0]
 
                 # Import the module from file
-                spec = importlib.util.spec_from_file_location(module_name, file_path)
+                spec = importlib.util.spec_from_file_location(module_name, entry.path)
                 module = importlib.util.module_from_spec(spec)
                 spec.loader.exec_module(module)
 
-                # Check and import
-                for name, obj in inspect.getmembers(module, inspect.isclass):
-                    if obj.__module__ == module.__name__ and issubclass(obj, BleDevice) and obj is not BleDevice:
-                        BleDevice.DEVICE_CLASSES[obj.MANUFACTURER_ID] = obj
-                        break
-        logging.info(f"Device classes: {BleDevice.DEVICE_CLASSES}")
+                # Check and import, searching the class if the module does not declare it
+                if (device_class := getattr(module, 'DEVICE_CLASS', None)) is None:
+                    device_class = next((
+                        obj for obj in vars(module).values()
+                        if isinstance(obj, type) and obj.__module__ == module.__name__ and issubclass(obj, BleDevice) and obj is not BleDevice
+                    ), None)
+                if device_class is not None:
+                    BleDevice.DEVICE_CLASSES[device_class.MANUFACTURER_ID] = device_class
+        logging.info("Device classes: %s", BleDevice.DEVICE_CLASSES)
 
     def _load_configuration(self):
         self.info['manufacturer_id'] = self.MANUFACTURER_ID
@@ -124,11 +221,12 @@ class BleDevice(object):
                 raise ValueError(f"{self._plog} Configuration '{list_key}' must be a list")
 
         for list_mandatory in ['roles', 'regs']:
-            if self.info[list_mandatory].__len__() < 1:
+            if not self.info[list_mandatory]:
                 raise ValueError(f"{self._plog} Configuration '{list_mandatory}' must have at least one element")
 
+        role_instances = BleRole._ROLE_INSTANCE
         for role in self.info['roles']:
-            if role is not None and role not in BleRole._ROLE_INSTANCE:
+            if role is not None and role not in role_instances:
                 raise ValueError(f"{self._plog} Unknown role '{role}'")
 
         for index, reg in enumerate(self.info['regs']):
@@ -139,54 +237,57 @@ class BleDevice(object):
                     raise ValueError(f"{self._plog} Missing key '{key}' in reg {reg['name']}")
             if (reg_type := reg['type']) not in BleDevice._ALLOWED_TYPES:
                 raise ValueError(f"{self._plog} Data type {reg_type} in reg {reg['name']} is not allowed")
-            if reg_type == dbus.types.String:
+            if not isinstance(reg['offset'], int):
+                raise ValueError(f"{self._plog} 'offset' in reg {reg['name']} must be an integer")
+            for key in ['bits', 'shift']:
+                if (value := reg.get(key, None)) is not None and not isinstance(value, int):
+                    raise ValueError(f"{self._plog} '{key}' in reg {reg['name']} must be an integer")
+            # Types without a default length, i.e. String and Double, must define it
+            if reg_type not in _TYPE_BITS:
                 if (bits := reg.get('bits', None)) is None:
                     raise ValueError(f"{self._plog} missing 'bits' in reg {reg['name']}")
-                elif not isinstance(bits, int):
-                    raise ValueError(f"{self._plog} 'bits' in reg {reg['name']} must be an integer")
-                elif bits % 8 != 0:
+                elif reg_type == dbus.types.String and bits % 8 != 0:
                     raise ValueError(f"{self._plog} 'bits' in reg {reg['name']} must be a multiple of 8")
+            if not (flags := frozenset(reg.get('flags', ()))) <= BleDevice._ALLOWED_FLAGS:
+                raise ValueError(f"{self._plog} Unknown flags {list(flags - BleDevice._ALLOWED_FLAGS)} in reg {reg['name']}")
+            if reg.get('scale', None) == 0:
+                raise ValueError(f"{self._plog} 'scale' in reg {reg['name']} can not be 0")
             if 'roles' in reg:
                 for role in reg['roles']:
-                    if role is not None and role not in BleRole._ROLE_INSTANCE:
+                    if role is not None and role not in role_instances:
                         raise ValueError(f"{self._plog} Unknown role '{role}' in reg {reg['name']}")
+                    if role is not None and role not in self.info['roles']:
+                        raise ValueError(f"{self._plog} Role '{role}' in reg {reg['name']} is not a device role")
+
+        _validate_settings_alarms(self.info, self._plog)
 
-        for index, setting in enumerate(self.info['settings']):
-            if 'name' not in setting:
-                raise ValueError(f"{self._plog} Missing 'name' in setting at index {index}")
-            if 'props' not in setting:
-                raise ValueError(f"{self._plog} Missing 'props' definition in setting {setting['name']}")
-            for key in ['def', 'min', 'max']:
-                if key not in setting['props']:
-                    raise ValueError(f"{self._plog} Missing key '{key}' in setting {setting['name']}")
-
-        for index, alarm in enumerate(self.info['alarms']):
-            if 'name' not in alarm:
-                raise ValueError(f"{self._plog} Missing 'name' in alarm at index {index}")
-            for key in ['name', 'update']:
-                if key not in alarm:
-                    raise ValueError(f"{self._plog} Missing key '{key}' in alarm {alarm['name']}")
-
-    def _init_settings(self, role_service: DbusRoleService, instance):
+        # Regs are only compiled once the whole configuration is valid
+        self._compile_regs()
+
+    def _init_settings(self, role_service: DbusRoleService, instance) -> list:
+        registrations = []
         for setting in instance.info['settings']:
             callback = None
             if (onchange := setting.get('onchange', None)) is not None:
                 callback = partial(onchange, role_service)
-            role_service.add_setting(setting, callback)
-
-    def _configure_role_service(self, role_service: DbusRoleService):
-        role_service.init_custom_name()
-        role_service.set_device_name()
+            registrations.append(partial(role_service.add_setting, setting, callback))
+        return registrations
 
-        self._init_settings(role_service, role_service.ble_role)
-        for alarm in role_service.ble_role.info['alarms']:
-            role_service.add_alarm(alarm)
+    def _init_alarms(self, role_service: DbusRoleService, instance) -> list:
+        return [partial(role_service.add_alarm, alarm) for alarm in instance.info['alarms']]
 
-        role_service.ble_role.init(role_service)
-
-        self._init_settings(role_service, self)
-        for alarm in self.info['alarms']:
-            role_service.add_alarm(alarm)
+    def _configure_role_service(self, role_service: DbusRoleService):
+        # Items are all created in a single service transaction, in order
+        ble_role = role_service.ble_role
+        role_service.register_batch([
+            role_service.init_custom_name,
+            role_service.set_device_name,
+            *self._init_settings(role_service, ble_role),
+            *self._init_alarms(role_service, ble_role),
+            partial(ble_role.init, role_service),
+            *self._init_settings(role_service, self),
+            *self._init_alarms(role_service, self),
+        ])
 
     def _on_enabled_changed(self, role_service: DbusRoleService, is_enabled: int):
         if is_enabled:
@@ -199,143 +300,229 @@ class BleDevice(object):
         self._load_configuration()
         self._check_configuration()
 
-        logging.debug(f"{self._plog} initializing device ...")
+        logging.debug("%s initializing device ...", self._plog)
 
         # Init role services
+        self._ble_service = DbusBleService.get()
         for role_name in self.info['roles']:
             role_service = DbusRoleService(self, BleRole.get_instance(role_name))
             self._role_services[role_name] = role_service
             # Initializing Dbus service
             self._configure_role_service(role_service)
             # Creating entries in ble service to enable/disable options
-            DbusBleService.get().register_role_service(role_service, partial(self._on_enabled_changed, role_service))
-        logging.debug(f"{self._plog} initialized")
+            self._ble_service.register_role_service(role_service, partial(self._on_enabled_changed, role_service))
+
+        # Binding references used on each advertisement
+        self._handle_plan = tuple(
+            (
+                role_service,
+                role_service.ble_role.get_name(),
+                role_service.ble_role.update_data,
+                tuple(role_service.ble_role.info['alarms']) + tuple(self.info['alarms'])
+            )
+            for role_service in self._role_services.values()
+        )
+        logging.debug("%s initialized", self._plog)
+
+    @staticmethod
+    def _compile_reg(reg: dict, device_roles: list = ()) -> CompiledReg:
+        _type = reg['type']
+        flags = frozenset(reg.get('flags', ()))
+        shift: int = reg.get('shift', None)
+
+        signed = _type in BleDevice._SIGNED_TYPES
+        big_endian = 'REG_FLAG_BIG_ENDIAN' in flags
+
+        # Get data length
+        if (bits := reg.get('bits', None)) is None:
+            bits = _TYPE_BITS.get(_type, None)
+        size = (bits + (shift if shift is not None else 0) + 7) >> 3 if bits is not None else None
+
+        # Single bit booleans are read directly from their byte
+        kind = _TYPE_KIND.get(_type, None)
+        bit_byte = bit = None
+        if kind == _KIND_BOOL and bits == 1 and shift is not None and 'REG_FLAG_INVALID' not in flags \
+                and all(reg.get(key, None) is None for key in ('mask', 'scale', 'bias', 'xlate')):
+            kind = _KIND_BIT
+            bit_byte = reg['offset'] + (size - 1 - (shift >> 3) if big_endian else shift >> 3)
+            bit = shift & 7
+
+        # Multiplying is cheaper than dividing. For powers of two, the reciprocal is exact and results are
+        # the same. For scales set as 1/n, n is not exactly the reciprocal of the rounded scale: results
+        # match division for the configured scales (i.e. 1/10 on integer regs), not for any scale.
+        # Check new 1/n scales against division over their reg range.
+        scale = reg.get('scale', None) or None
+        scale_recip = None
+        if scale is not None and (math.frexp(scale)[0] == 0.5 or (1 / scale).is_integer()):
+            scale, scale_recip = None, 1 / scale
+
+        # Byte aligned data can be read without slicing
+        unpack = None
+        if shift is None and (format_char := _STRUCT_FORMATS.get(bits, None)) is not None:
+            unpack = struct.Struct(('>' if big_endian else '<') + (format_char if signed else format_char.upper())).unpack_from
+
+        return CompiledReg(
+            name=reg['name'],
+            kind=kind,
+            offset=reg['offset'],
+            size=size,
+            end=reg['offset'] + size if size is not None else None,
+            bits=bits,
+            byteorder='big' if big_endian else 'little',
+            signed=signed,
+            mask=reg.get('mask', None),
+            shift=shift,
+            bits_mask=(1 << bits) - 1 if shift is not None and bits is not None else None,
+            bit_byte=bit_byte,
+            bit=bit,
+            unpack=unpack,
+            scale=scale,
+            scale_recip=scale_recip,
+            bias=reg.get('bias', None),
+            xlate=reg.get('xlate', None),
+            check_invalid='REG_FLAG_INVALID' in flags,
+            inval=reg.get('inval', None),
+            roles=tuple(reg['roles']) if reg.get('roles', None) is not None else tuple(device_roles),
+        )
+
+    def _compile_regs(self):
+        # Only keep regs published to at least one role, and dispatch them by role.
+        # Results are only kept once all regs are compiled, never partially.
+        compiled_regs = []
+        regs_by_role = {role: [] for role in self.info['roles']}
+        for reg in self.info['regs']:
+            compiled_reg = self._compile_reg(reg, self.info['roles'])
+            if not compiled_reg.roles or None in compiled_reg.roles:
+                continue
+            compiled_regs.append(compiled_reg)
+            for role in compiled_reg.roles:
+                regs_by_role[role].append(compiled_reg)
+        self._compiled_regs = compiled_regs
+        self._regs_by_role = {role: tuple(regs) for role, regs in regs_by_role.items()}
 
     def load_str(self, reg: dict, manufacturer_data: bytes) -> str:
+        return self._load_str(self._compile_reg(reg), manufacturer_data)
+
+    def load_int(self, reg: dict, manufacturer_data: bytes) -> any:
+        return self._load_int(self._compile_reg(reg), manufacturer_data)
+
+    def _load_str(self, reg: CompiledReg, manufacturer_data: bytes, data_len: int = None) -> str:
         # Check there is enough data
-        offset: int = reg['offset']
-        size = (reg['bits'] + 7) >> 3
-        if size > len(manufacturer_data) - offset:
-            logging.error(
-                f"{self._plog} can not parse {reg['name']}, field is longer than manufacturer data, ignoring it")
+        if reg.end > (data_len if data_len is not None else len(manufacturer_data)):
+            logging.error("%s can not parse %s, field is longer than manufacturer data, ignoring it", self._plog, reg.name)
             return None
 
-        return manufacturer_data[offset:offset + size].decode(encoding='utf-8')
-
-    def load_int(self, reg: dict, manufacturer_data: bytes) -> any:
-        offset: int = reg['offset']
-        flags: list = reg.get('flags', [])
-        shift: int = reg.get('shift', None)
-        _type = reg['type']
+        return _utf8_decode(manufacturer_data[reg.offset:reg.end], 'strict', True)[0]
 
-        # Get data length
-        if (bits := reg.get('bits', None)) is None:
-            match _type:
-                case dbus.types.Boolean | dbus.types.Byte:
-                    bits = 8
-                case dbus.types.Int16 | dbus.types.UInt16:
-                    bits = 16
-                case dbus.types.Int32 | dbus.types.UInt32:
-                    bits = 32
-                case dbus.types.Int64 | dbus.types.UInt64:
-                    bits = 64
-                case _:
-                    return None
+    def _load_int(self, reg: CompiledReg, manufacturer_data: bytes, data_len: int = None) -> any:
+        if (end := reg.end) is None:
+            return None
 
         # Check there is enough data
-        size = (bits + (shift if shift is not None else 0) + 7) >> 3
-        if size > len(manufacturer_data) - offset:
-            logging.error(
-                f"{self._plog} can not parse {reg['name']}, field is longer than manufacturer data, ignoring it")
+        if end > (data_len if data_len is not None else len(manufacturer_data)):
+            logging.error("%s can not parse %s, field is longer than manufacturer data, ignoring it", self._plog, reg.name)
             return None
 
         # Get raw value
-        value = int.from_bytes(
-            manufacturer_data[offset:offset + size],
-            byteorder='big' if 'REG_FLAG_BIG_ENDIAN' in flags else 'little',
-            signed=_type in BleDevice._SIGNED_TYPES
-        )
+        if reg.unpack is not None:
+            value = reg.unpack(manufacturer_data, reg.offset)[0]
+        else:
+            value = int.from_bytes(manufacturer_data[reg.offset:end], byteorder=reg.byteorder, signed=reg.signed)
 
         # Applying mask, if any
-        if reg.get('mask', None) is not None:
-            value = value & reg['mask']
+        if reg.mask is not None:
+            value = value & reg.mask
 
         # Applying shift and triming on bits size
-        if shift is not None:
-            value = (value >> shift) & ((1 << bits) - 1)
+        if reg.shift is not None:
+            value = (value >> reg.shift) & reg.bits_mask
 
         # Post actions
-        if scale := reg.get('scale', None):
-            value = value / scale
-        if bias := reg.get('bias', None):
-            value = value + bias
-        if xlate := reg.get('xlate', None):
-            value = xlate(value)
-        if 'REG_FLAG_INVALID' in flags and value == reg.get('inval', None):
+        if reg.scale_recip is not None:
+            value = value * reg.scale_recip
+        elif reg.scale is not None:
+            value = value / reg.scale
+        if reg.bias is not None:
+            value = value + reg.bias
+        if reg.xlate:
+            value = reg.xlate(value)
+        if reg.check_invalid and value == reg.inval:
             value = None
         return value
 
     def _parse_manufacturer_data(self, manufacturer_data: bytes) -> dict:
-        values = {}
-        for role in self.info['roles']:
-            values[role] = {}
-        for reg in self.info['regs']:
-            value = None
-            match reg['type']:
-                case dbus.types.Boolean:
-                    value = bool(self.load_int(reg, manufacturer_data))
-                case dbus.types.Byte | dbus.types.Int16 | dbus.types.UInt16 | dbus.types.Int32 | dbus.types.UInt32 | dbus.types.Int64 | dbus.types.UInt64 | dbus.types.Double:
-                    value = self.load_int(reg, manufacturer_data)
-                case dbus.types.String:
-                    value = self.load_str(reg, manufacturer_data)
-                case _:
-                    pass
-
-            if value is None:
-                continue
+        if self._compiled_regs is None:
+            self._compile_regs()
 
-            if (roles := reg.get('roles', None)) and None in roles:
-                continue
-            if roles is None:
-                roles = self.info['roles']
-
-            for role in roles:
-                values[role][(reg['name'])] = value
+        # Fill each role values from its own regs. Slicing a memoryview does not copy data
+        manufacturer_data = memoryview(manufacturer_data)
+        data_len = len(manufacturer_data)
+        values = {}
+        shared = {}  # Values of regs published to several roles, parsed once
+        for role, regs in self._regs_by_role.items():
+            values[role] = role_values = {}
+            for reg in regs:
+                if len(reg.roles) == 1:
+                    value = self._parse_reg(reg, manufacturer_data, data_len)
+                elif reg in shared:
+                    value = shared[reg]
+                else:
+                    value = shared[reg] = self._parse_reg(reg, manufacturer_data, data_len)
+                if value is not None:
+                    role_values[reg.name] = value
         return values
 
-    def _update_dbus_data(self, role_service: DbusRoleService, sensor_data: dict):
-        for name, value in sensor_data.items():
-            role_service[name] = value
+    def _parse_reg(self, reg: CompiledReg, manufacturer_data: memoryview, data_len: int) -> any:
+        kind = reg.kind
+        if kind == _KIND_BIT:
+            if reg.end <= data_len:
+                return bool((manufacturer_data[reg.bit_byte] >> reg.bit) & 1)
+            # Generic loading logs the error
+            return bool(self._load_int(reg, manufacturer_data, data_len))
+        if kind == _KIND_BOOL:
+            return bool(self._load_int(reg, manufacturer_data, data_len))
+        if kind == _KIND_INT:
+            return self._load_int(reg, manufacturer_data, data_len)
+        if kind == _KIND_STR:
+            return self._load_str(reg, manufacturer_data, data_len)
+        return None
 
     def handle_data(self, manufacturer_data: bytes):
         """
         Optional overload, check product id to adapt to various harware if any and/or implement specific parsing logic.
         Returns 0 if this class can manage the device, anything else if it can't.
         """
-        if not DbusBleService.get().is_device_enabled(self.info):
-            logging.debug(f"{self._plog} device not enabled, skipping")
+        if not self._ble_service.is_device_enabled(self.info):
+            logging.debug("%s device not enabled, skipping", self._plog)
             return
 
+        # Devices repeat their advertisement until data changes, only keeping role services alive.
+        # Alarms are still updated, they can depend on settings changed since.
+        if manufacturer_data == self._last_manufacturer_data:
+            for role_service, _, _, alarms in self._handle_plan:
+                role_service.update_alarms(alarms)
+                role_service.connect()
+            return
+        self._last_manufacturer_data = manufacturer_data
+
         # Parse data
         sensor_data: dict = self._parse_manufacturer_data(manufacturer_data)
-        logging.debug(f"{self._plog} data '{manufacturer_data}' parsed: {sensor_data}")
-        for role_service in self._role_services.values():
+        logging.debug("%s data '%s' parsed: %s", self._plog, manufacturer_data, sensor_data)
+        for role_service, role_name, role_update_data, alarms in self._handle_plan:
             # Filtering data
-            role_data = sensor_data[role_service.ble_role.get_name()]
+            role_data = sensor_data[role_name]
 
-            # Update sensor data from update callbacks
-            role_service.ble_role.update_data(role_service, role_data)
-            self.update_data(role_service, role_data)
+            # Changes are signaled on dbus at once
+            with role_service.batch():
+                # Update sensor data from update callbacks
+                role_update_data(role_service, role_data)
+                self.update_data(role_service, role_data)
 
-            # Update Dbus with new data
-            self._update_dbus_data(role_service, role_data)
+                # Update Dbus with new data
+                role_service.update(role_data)
 
-            # Update alarm states
-            for alarm in role_service.ble_role.info['alarms']:
-                role_service.update_alarm(alarm)
-            for alarm in self.info['alarms']:
-                role_service.update_alarm(alarm)
+                # Update alarm states, role ones first
+                role_service.update_alarms(alarms)
 
             # Start service if needed
             role_service.connect()
-
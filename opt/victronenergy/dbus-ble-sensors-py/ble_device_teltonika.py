@@ -16,6 +16,8 @@ class BleDeviceTeltonika(BleDevice):
         - https://wiki.teltonika-gps.com/view/EYE_SENSOR_/_BTSMP1#EYE_Sensor_Bluetooth%C2%AE_frame_parsing_example
     """
 
+    __slots__ = ()
+
     MANUFACTURER_ID = 0x089A
 
     def configure(self, manufacturer_data: bytes):
@@ -32,7 +34,7 @@ class BleDeviceTeltonika(BleDevice):
             ]
         })
         self._compute_regs(manufacturer_data)
-        logging.debug(f"{self._plog} computed regs: {self.info['regs']}")
+        logging.debug("%s computed regs: %s", self._plog, self.info['regs'])
 
     def _compute_regs(self, manufacturer_data: bytes):
         self.info['roles'] = []
@@ -58,15 +60,10 @@ class BleDeviceTeltonika(BleDevice):
             }
         ]
 
-        # Compute regs from flags
+        # Compute regs from flags, all held by byte 1
+        flags_byte = manufacturer_data[1] if len(manufacturer_data) > 1 else 0
         offset = 2
-        flag_mag = self.load_int({
-            'name': 'Flag',
-            'type': dbus.types.Boolean,
-            'offset': 1,
-            'shift': 2,
-            'bits': 1,
-        }, manufacturer_data)
+        flag_mag = (flags_byte >> 2) & 1
         if flag_mag:
             self.info['regs'].append({
                 'name': 'InputState',  # Magnet presence
@@ -76,15 +73,9 @@ class BleDeviceTeltonika(BleDevice):
                 'bits': 1,
                 'roles': ['digitalinput'],
             })
-            self.info['roles'].append('digitalinput')
-
-        flag_temp = self.load_int({
-            'name': 'Flag',
-            'type': dbus.types.Boolean,
-            'offset': 1,
-            'shift': 0,
-            'bits': 1,
-        }, manufacturer_data)
+            self._add_role('digitalinput')
+
+        flag_temp = flags_byte & 1
         if flag_temp:
             self.info['regs'].append({
                 'name': 'Temperature',
@@ -94,16 +85,10 @@ class BleDeviceTeltonika(BleDevice):
                 'flags': ['REG_FLAG_BIG_ENDIAN'],
                 'roles': ['temperature'],
             })
-            self.info['roles'].append('temperature')
+            self._add_role('temperature')
             offset = offset + 2
 
-        flag_humid = self.load_int({
-            'name': 'Flag',
-            'type': dbus.types.Boolean,
-            'offset': 1,
-            'shift': 1,
-            'bits': 1,
-        }, manufacturer_data)
+        flag_humid = (flags_byte >> 1) & 1
         if flag_humid:
             self.info['regs'].append({
                 'name': 'Humidity',
@@ -112,16 +97,10 @@ class BleDeviceTeltonika(BleDevice):
                 'flags': ['REG_FLAG_BIG_ENDIAN'],
                 'roles': ['temperature'],
             })
-            self.info['roles'].append('temperature')
+            self._add_role('temperature')
             offset = offset + 1
 
-        flag_mov = self.load_int({
-            'name': 'Flag',
-            'type': dbus.types.Boolean,
-            'offset': 1,
-            'shift': 4,
-            'bits': 1,
-        }, manufacturer_data)
+        flag_mov = (flags_byte >> 4) & 1
         if flag_mov:
             self.info['regs'].append({
                 'name': 'MovementState',
@@ -139,16 +118,10 @@ class BleDeviceTeltonika(BleDevice):
                 'flags': ['REG_FLAG_BIG_ENDIAN'],
                 'roles': ['movement'],
             })
-            self.info['roles'].append('movement')
+            self._add_role('movement')
             offset = offset + 2
 
-        flag_angle = self.load_int({
-            'name': 'Flag',
-            'type': dbus.types.Boolean,
-            'offset': 1,
-            'shift': 5,
-            'bits': 1,
-        }, manufacturer_data)
+        flag_angle = (flags_byte >> 5) & 1
         if flag_angle:
             self.info['regs'].append({
                 'name': 'Pitch',
@@ -165,16 +138,10 @@ class BleDeviceTeltonika(BleDevice):
                 'flags': ['REG_FLAG_BIG_ENDIAN'],
                 'roles': ['movement'],
             })
-            self.info['roles'].append('movement')
+            self._add_role('movement')
             offset = offset + 2
 
-        flag_bat = self.load_int({
-            'name': 'Flag',
-            'type': dbus.types.Boolean,
-            'offset': 1,
-            'shift': 7,
-            'bits': 1,
-        }, manufacturer_data)
+        flag_bat = (flags_byte >> 7) & 1
         if flag_bat:
             self.info['regs'].append({
                 'name': 'BatteryVoltage',
@@ -184,10 +151,16 @@ class BleDeviceTeltonika(BleDevice):
                 'bias': 2000,
             })
 
-        self.info['roles'] = list(set(self.info['roles']))
+    def _add_role(self, role: str):
+        # Keeping roles order, as it sets the order of role services creation
+        if role not in self.info['roles']:
+            self.info['roles'].append(role)
 
     def _byteToSignedInt(self, byte: bytes) -> int:
         return byte if byte < 128 else byte - 256
 
     def _get_low_battery_state(self, role_service) -> int:
         return int((role_service['LowBattery'] or 0) >= 1)
+
+
+DEVICE_CLASS = BleDeviceTeltonika
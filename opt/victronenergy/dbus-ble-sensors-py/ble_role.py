@@ -1,13 +1,38 @@
 import os
-import inspect
 import logging
 import importlib.util
 
+_SETTING_PROPS_KEYS = ('def', 'min', 'max')
+_ALARM_KEYS = ('name', 'update')
+
+
+def _validate_settings_alarms(info: dict, plog: str):
+    """
+    Checks 'settings' and 'alarms' definitions, as shared by role and device configurations.
+    """
+    for index, setting in enumerate(info['settings']):
+        if 'name' not in setting:
+            raise ValueError(f"{plog} Missing 'name' in setting at index {index}")
+        if 'props' not in setting:
+            raise ValueError(f"{plog} Missing 'props' definition in setting {setting['name']}")
+        for key in _SETTING_PROPS_KEYS:
+            if key not in setting['props']:
+                raise ValueError(f"{plog} Missing key '{key}' in setting {setting['name']}")
+
+    for index, alarm in enumerate(info['alarms']):
+        if 'name' not in alarm:
+            raise ValueError(f"{plog} Missing 'name' in alarm at index {index}")
+        for key in _ALARM_KEYS:
+            if key not in alarm:
+                raise ValueError(f"{plog} Missing key '{key}' in alarm {alarm['name']}")
+
 
 class BleRole(object):
     """
     Base class representing a type/kind/class of device.
     Defines common settings and alarms, most of which interracting with Venus OS UI and services through dbus.
+
+    Children classes should be declared in their module with a 'ROLE_CLASS' variable.
     """
 
     _ROLE_INSTANCE = {}
@@ -17,7 +42,7 @@ class BleRole(object):
             "name": None,       # Mandatory, str, role name
             'dev_instance': 0,  # Mandatory, int, base dev instance to compute final instance
             'settings': [],     # Optional, list of dict, settings that could be set through UI
-            'alarms': [],       # Optional, list of dict, raisable alarms
+            'alarms': [],       # Optional, list of dict, raisable alarms, cf. 'alarms' in BleDevice info for definition
         }
 
     def init(self, role_service):
@@ -41,27 +66,34 @@ class BleRole(object):
 
     @staticmethod
     def load_instances(execution_path: str):
+        # Instances are loaded once
+        if BleRole._ROLE_INSTANCE:
+            return
         role_classes_prefix = f"{os.path.splitext(os.path.basename(__file__))[0]}_"
 
         # Loading manufacturer specific classes
-        for filename in os.listdir(os.path.dirname(execution_path)):
-            if filename.startswith(role_classes_prefix) and filename.endswith('.py'):
-                file_path = os.path.join(os.path.dirname(execution_path), filename)
-                module_name = os.path.splitext(filename)[0]
+        with os.scandir(os.path.dirname(execution_path)) as entries:
+            for entry in entries:
+                if not (entry.name.startswith(role_classes_prefix) and entry.name.endswith('.py')):
+                    continue
+                module_name = os.path.splitext(entry.name)[0]
 
                 # Import the module from file
-                spec = importlib.util.spec_from_file_location(module_name, file_path)
+                spec = importlib.util.spec_from_file_location(module_name, entry.path)
                 module = importlib.util.module_from_spec(spec)
                 spec.loader.exec_module(module)
 
-                # Check and import
-                for name, obj in inspect.getmembers(module, inspect.isclass):
-                    if obj.__module__ == module.__name__ and issubclass(obj, BleRole) and obj is not BleRole:
-                        instance = obj()
-                        instance.check_configuration()
-                        BleRole._ROLE_INSTANCE[instance.info['name']] = instance
-                        break
-        logging.info(f"Role instances: {BleRole._ROLE_INSTANCE}")
+                # Check and import, searching the class if the module does not declare it
+                if (role_class := getattr(module, 'ROLE_CLASS', None)) is None:
+                    role_class = next((
+                        obj for obj in vars(module).values()
+                        if isinstance(obj, type) and obj.__module__ == module.__name__ and issubclass(obj, BleRole) and obj is not BleRole
+                    ), None)
+                if role_class is not None:
+                    instance = role_class()
+                    instance.check_configuration()
+                    BleRole._ROLE_INSTANCE[instance.info['name']] = instance
+        logging.info("Role instances: %s", BleRole._ROLE_INSTANCE)
 
     def check_configuration(self):
         self._plog = f"{self.info['name']}:"
@@ -79,21 +111,7 @@ class BleRole(object):
             if not isinstance(self.info[list_key], list):
                 raise ValueError(f"{self._plog} Configuration '{list_key}' must be a list")
 
-        for index, setting in enumerate(self.info['settings']):
-            if 'name' not in setting:
-                raise ValueError(f"{self._plog} Missing 'name' in setting at index {index}")
-            if 'props' not in setting:
-                raise ValueError(f"{self._plog} Missing 'props' definition in setting {setting['name']}")
-            for key in ['def', 'min', 'max']:
-                if key not in setting['props']:
-                    raise ValueError(f"{self._plog} Missing key '{key}' in setting {setting['name']}")
-
-        for index, alarm in enumerate(self.info['alarms']):
-            if 'name' not in alarm:
-                raise ValueError(f"{self._plog} Missing 'name' in alarm at index {index}")
-            for key in ['name', 'update']:
-                if key not in alarm:
-                    raise ValueError(f"{self._plog} Missing key '{key}' in alarm {alarm['name']}")
+        _validate_settings_alarms(self.info, self._plog)
 
     def get_name(self):
         return self.info['name']
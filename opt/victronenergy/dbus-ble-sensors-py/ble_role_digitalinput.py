@@ -136,12 +136,12 @@ class BleRoleDigitalInput(BleRole):
     def _update_state(self, role_service, _type: int, input_state: int, invert_translation: int):
         __type = _type if _type is not None else role_service['Type']
         if __type == 0:
-            logging.debug(f"{self._plog} type disabled, setting state to 0")
+            logging.debug("%s type disabled, setting state to 0", self._plog)
             role_service['State'] = 0
             return
         _input_state = input_state if input_state is not None else self._input_state
         _invert_translation = invert_translation if invert_translation is not None else role_service['Settings/InvertTranslation']
-        logging.debug(f"{self._plog} updating state with: type={__type}, input_state={_input_state}, invert_translation={_invert_translation}")
+        logging.debug("%s updating state with: type=%s, input_state=%s, invert_translation=%s", self._plog, __type, _input_state, _invert_translation)
         role_service['State'] = self._get_state_offset(__type) + (_input_state ^ _invert_translation)
 
     def _inc_count(self, role_service):
@@ -153,7 +153,9 @@ class BleRoleDigitalInput(BleRole):
         _invert_translation = invert_translation if invert_translation is not None else role_service['Settings/InvertTranslation']
         _alarm_setting = alarm_setting if alarm_setting is not None else role_service['Settings/AlarmSetting']
         _invert_alarm = invert_alarm if invert_alarm is not None else role_service['Settings/InvertAlarm']
-        logging.debug(f"{self._plog} getting alarm state with: input_state={_input_state}, invert_translation={_invert_translation}, alarm_setting={_alarm_setting}, invert_alarm={_invert_alarm}")
+        logging.debug(
+            "%s getting alarm state with: input_state=%s, invert_translation=%s, alarm_setting=%s, invert_alarm=%s",
+            self._plog, _input_state, _invert_translation, _alarm_setting, _invert_alarm)
         return 2 * bool(((_input_state ^ _invert_translation) ^ _invert_alarm) and _alarm_setting)
 
     def update_data(self, role_service, sensor_data: dict):
@@ -171,15 +173,15 @@ class BleRoleDigitalInput(BleRole):
 
         match int(new_type):
             case 0:
-                logging.warning(f"{self._plog} type '0' set, disabling digital input")
+                logging.warning("%s type '0' set, disabling digital input", self._plog)
                 self._update_state(role_service, 0, None, None)
             case 1 | 9 | 11:
-                logging.warning(f"{self._plog} can not manage type '{new_type}', disabling digital input")
+                logging.warning("%s can not manage type '%s', disabling digital input", self._plog, new_type)
                 GLib.idle_add(disable)
             case 2 | 3 | 4 | 5 | 6 | 7 | 8 | 10:
                 self._update_state(role_service, int(new_type), None, None)
             case _:
-                logging.error(f"{self._plog} unknown type '{new_type}', disabling digital input")
+                logging.error("%s unknown type '%s', disabling digital input", self._plog, new_type)
                 GLib.idle_add(disable)
 
     def _update_invert_translation(self, role_service, new_translation):
@@ -194,3 +196,6 @@ class BleRoleDigitalInput(BleRole):
 
     def _update_alarm_state(self, role_service) -> int:
         return self._get_alarm_state(role_service, None, None, None, None)
+
+
+ROLE_CLASS = BleRoleDigitalInput
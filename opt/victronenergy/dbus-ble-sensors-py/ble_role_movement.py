@@ -52,3 +52,6 @@ class BleRoleMovement(BleRole):
         # Keep track of movement count for alarm comparison
         if (count := sensor_data.get('MovementCount', None)) is not None:
             self._count = count
+
+
+ROLE_CLASS = BleRoleMovement
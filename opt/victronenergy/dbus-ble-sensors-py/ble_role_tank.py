@@ -11,6 +11,9 @@ class BleRoleTank(BleRole):
 
     def __init__(self):
         super().__init__()
+        # Alarm threshold paths, indexed by alarm state
+        self._high_keys = ('/Alarms/High/Active', '/Alarms/High/Restore')
+        self._low_keys = ('/Alarms/Low/Active', '/Alarms/Low/Restore')
 
         self.info.update(
             {
@@ -69,11 +72,13 @@ class BleRoleTank(BleRole):
                 'alarms': [
                     {
                         'name': '/Alarms/High/State',
-                        'update': self.get_alarm_high_state  # Can be overloaded by device class
+                        'update': self.get_alarm_high_state,  # Can be overloaded by device class
+                        'inputs': ('/Alarms/High/Enable', '/Alarms/High/State', *self._high_keys, 'Level')
                     },
                     {
                         'name': '/Alarms/Low/State',
-                        'update': self.get_alarm_low_state  # Can be overloaded by device class
+                        'update': self.get_alarm_low_state,  # Can be overloaded by device class
+                        'inputs': ('/Alarms/Low/Enable', '/Alarms/Low/State', *self._low_keys, 'Level')
                     },
                 ]
             }
@@ -86,7 +91,7 @@ class BleRoleTank(BleRole):
 
         if role_service['/Alarms/High/Enable']:
             alarm_state = bool(role_service['/Alarms/High/State'])
-            alarm_threshold = role_service[f"/Alarms/High/{"Restore" if alarm_state else "Active"}"]
+            alarm_threshold = role_service[self._high_keys[alarm_state]]
             tank_level = float(role_service['Level'])
             return int(tank_level > alarm_threshold)
         else:
@@ -99,8 +104,11 @@ class BleRoleTank(BleRole):
 
         if role_service['/Alarms/Low/Enable']:
             alarm_state = bool(role_service['/Alarms/Low/State'])
-            alarm_threshold = role_service[f"/Alarms/Low/{"Restore" if alarm_state else "Active"}"]
+            alarm_threshold = role_service[self._low_keys[alarm_state]]
             tank_level = float(role_service['Level'])
             return int(tank_level < alarm_threshold)
         else:
             return 0
+
+
+ROLE_CLASS = BleRoleTank
@@ -57,3 +57,6 @@ class BleRoleTemperature(BleRole):
 
     def offset_update(self, role_service, new_value):
         role_service['Temperature'] = self._raw_temp + new_value
+
+
+ROLE_CLASS = BleRoleTemperature
@@ -7,6 +7,8 @@ PROCESS_VERSION = '1.0.0'
 
 # Timeouts
 DBUS_ROLE_SERVICES_TIMEOUT = 1800  # 30 min
+# Scan loop duty cycle defaults, in seconds, overridable by ScanWindow and ScanInterval settings.
+# They set when scanners are started and stopped, not the BlueZ/HCI scan interval and window.
 SCAN_TIMEOUT = 15
 SCAN_INTERVAL_STANDARD = 20  # 90
-SCAN_SLEEP = SCAN_INTERVAL_STANDARD - SCAN_TIMEOUT
+SCAN_TIMING_MAX = 3600
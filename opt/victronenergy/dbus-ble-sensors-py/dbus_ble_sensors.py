@@ -1,4 +1,5 @@
 #!/usr/bin/env python3
+from __future__ import annotations
 import sys
 import os
 sys.path.insert(1, os.path.join(os.path.dirname(__file__), 'ext'))
@@ -6,16 +7,18 @@ sys.path.insert(1, os.path.join(os.path.dirname(__file__), 'ext', 'velib_python'
 import logging
 import asyncio
 import dbus
-from dbus.mainloop.glib import DBusGMainLoop
 from argparse import ArgumentParser
+from typing import TYPE_CHECKING
 from ble_device import BleDevice
 from ble_role import BleRole
 from dbus_ble_service import DbusBleService
 from dbus_settings_service import DbusSettingsService
-import bleak
-import gbulb
 from logger import setup_logging
-from conf import SCAN_TIMEOUT, SCAN_SLEEP
+if TYPE_CHECKING:
+    from bleak import BleakScanner
+
+# Translation table removing separators from mac addresses
+_MAC_SEPARATORS = str.maketrans('', '', ':')
 
 
 class DbusBleSensors(object):
@@ -40,29 +43,38 @@ class DbusBleSensors(object):
         # Accessor to dbus ble dedicated service (default : com.victronenergy.ble)
         self._dbus_ble_service = DbusBleService()
 
-        # Initialze BT adapters search
+        # Initialze BT adapters search, with one persistent scanner per adapter
         self._adapters = []
+        self._scanners: dict[str, BleakScanner] = {}
+        self._scanning: set[str] = set()
         self._list_adapters()
 
-        # Knowned device lists
+        # Knowned device lists, by mac address as integer
         self._known_mac = {}
-        self._ignored_mac = []
+        self._ignored_mac = set()
+        # Known devices not seen yet in current scan cycle, to end scan window early once all have been seen
+        self._cycle_pending: set[int] = set()
+        self._all_seen = asyncio.Event()
 
         # Load definition classes
         BleRole.load_instances(os.path.abspath(__file__))
         BleDevice.load_classes(os.path.abspath(__file__))
 
     def _list_adapters(self):
-        # Adding callback for futur connections/disconnections
+        # Adding callback for futur connections/disconnections, only from bluez object manager
         self._dbus.add_signal_receiver(
             self._on_interfaces_added,
             dbus_interface='org.freedesktop.DBus.ObjectManager',
-            signal_name='InterfacesAdded'
+            signal_name='InterfacesAdded',
+            bus_name='org.bluez',
+            path='/'
         )
         self._dbus.add_signal_receiver(
             self._on_interfaces_removed,
             dbus_interface='org.freedesktop.DBus.ObjectManager',
-            signal_name='InterfacesRemoved'
+            signal_name='InterfacesRemoved',
+            bus_name='org.bluez',
+            path='/'
         )
 
         # Initial search for adapters
@@ -75,91 +87,153 @@ class DbusBleSensors(object):
             self._on_interfaces_added(path, ifaces)
 
     def _on_interfaces_added(self, path, interfaces):
-        if not str(path).startswith('/org/bluez'):
-            return
-        name = path.split('/')[-1]
+        # Only adapters are relevant, most of bluez objects are devices
         if 'org.bluez.Adapter1' in interfaces:
-            adapter = self._dbus.get_object('org.bluez', path)
-            props = dbus.Interface(adapter, 'org.freedesktop.DBus.Properties')
-            mac = props.Get('org.bluez.Adapter1', 'Address')
-            logging.info(f"{name}: adding adapter, path='{path}', address='{mac}'")
+            name = path.rpartition('/')[2]
+            # Both GetManagedObjects and InterfacesAdded provide interface properties, no need to query them
+            mac = interfaces['org.bluez.Adapter1'].get('Address', None)
+            logging.info("%s: adding adapter, path='%s', address='%s'", name, path, mac)
             self._adapters.append(name)
             self._dbus_ble_service.add_ble_adapter(name, mac)
 
     def _on_interfaces_removed(self, path, interfaces):
-        if not str(path).startswith('/org/bluez'):
-            return
-        name = path.split('/')[-1]
         if 'org.bluez.Adapter1' in interfaces:
+            name = path.rpartition('/')[2]
             # Remove adapter
             self._dbus_ble_service.remove_ble_adapter(name)
             self._adapters.remove(name)
-            logging.info(f"{name}: adapter removed")
+            scanner = self._scanners.pop(name, None)
+            if scanner is not None and name in self._scanning:
+                asyncio.ensure_future(self._stop_scan(name, scanner))
+            logging.info("%s: adapter removed", name)
 
-    async def _scan(self, adapter: str):
-        def _scan_callback(device, advertisement_data):
-            dev_mac = "".join(device.address.split(':')).lower()
-            if dev_mac in self._ignored_mac:
-                # Ignoring devices already evaluated
-                return
+    def _scan_callback(self, device, advertisement_data):
+        mac = int(device.address.translate(_MAC_SEPARATORS), 16)
+        if mac in self._ignored_mac:
+            # Ignoring devices already evaluated
+            return
 
+        # Mac string form and log prefix are only built for new devices, known ones have theirs
+        if (dev_instance := self._known_mac.get(mac, None)) is None:
+            dev_mac = f"{mac:012x}"
             dev_name = device.name
             plog = f"{dev_mac} - {dev_name}:"
-            logging.debug(f"{plog} received advertisement '{advertisement_data}'")
-            if advertisement_data.manufacturer_data is None or len(advertisement_data.manufacturer_data) < 1:
-                logging.info(f"{plog} ignoring, device without manufacturer data")
-                self._ignored_mac.append(dev_mac)
-                return
+        else:
+            plog = dev_instance._plog
+        logging.debug("%s received advertisement '%s'", plog, advertisement_data)
+        manufacturer_data = advertisement_data.manufacturer_data
+        if not manufacturer_data:
+            logging.info("%s ignoring, device without manufacturer data", plog)
+            self._ignored_mac.add(mac)
+            return
 
+        # Loop through manufacturer data fields, even though most devices only use one
+        for man_id, man_data in manufacturer_data.items():
             # First time device initialization
-            # Loop through manufacturer data fields, even though most devices only use one
-            for man_id, man_data in advertisement_data.manufacturer_data.items():
-                if dev_mac not in self._known_mac.keys():
-                    device_class = BleDevice.DEVICE_CLASSES.get(man_id, None)
-                    if device_class is None:
-                        logging.info(f"{plog} ignoring, no device configuration class for manufacturer '{man_id}'")
-                        self._ignored_mac.append(dev_mac)
-                        return
-
-                    # Run device specific parsing
-                    logging.info(f"{plog} initializing device with class {device_class}")
-                    dev_instance = device_class(dev_mac, dev_name)
-                    dev_instance.configure(man_data)
-                    dev_instance.init()
-                    self._known_mac[dev_mac] = dev_instance
-                else:
-                    dev_instance = self._known_mac[dev_mac]
-
-                # Parsing data
-                logging.info(f"{plog} received manufacturer data: {man_data}")
-                dev_instance.handle_data(man_data)
-
-        logging.debug(f"{adapter}: Scanning ...")
+            if dev_instance is None:
+                device_class = BleDevice.DEVICE_CLASSES.get(man_id, None)
+                if device_class is None:
+                    logging.info("%s ignoring, no device configuration class for manufacturer '%s'", plog, man_id)
+                    self._ignored_mac.add(mac)
+                    return
+
+                # Run device specific parsing
+                logging.info("%s initializing device with class %s", plog, device_class)
+                dev_instance = device_class(dev_mac, dev_name)
+                dev_instance.configure(man_data)
+                dev_instance.init()
+                self._known_mac[mac] = dev_instance
+
+            # Parsing data
+            logging.info("%s received manufacturer data: %s", plog, man_data)
+            dev_instance.handle_data(man_data)
+
+        if self._cycle_pending:
+            self._cycle_pending.discard(mac)
+            if not self._cycle_pending:
+                self._all_seen.set()
+
+    def _create_scanners(self):
+        # bleak is heavy, it is only imported by the scan loop, once the service is up
+        import bleak
+        for adapter in self._adapters:
+            if adapter not in self._scanners:
+                self._scanners[adapter] = bleak.BleakScanner(detection_callback=self._scan_callback, adapter=adapter)
+
+    async def _start_scan(self, adapter: str, scanner: BleakScanner):
+        logging.debug("%s: Scanning ...", adapter)
         try:
-            await bleak.BleakScanner.discover(
-                timeout=SCAN_TIMEOUT,
-                adapter=adapter,
-                return_adv=True,
-                detection_callback=_scan_callback
-            )
-            logging.debug(f"{adapter}: Scan finished")
+            await scanner.start()
+            self._scanning.add(adapter)
         except Exception:
-            logging.exception(f"{adapter}: Scan error")
+            logging.exception("%s: Scan error", adapter)
+
+    async def _stop_scan(self, adapter: str, scanner: BleakScanner):
+        self._scanning.discard(adapter)
+        try:
+            await scanner.stop()
+            logging.debug("%s: Scan finished", adapter)
+        except Exception:
+            logging.exception("%s: Scan stop error", adapter)
+
+    @staticmethod
+    async def _run_scanners(action, scanners: list[tuple[str, BleakScanner]]):
+        # Most setups have a single adapter, awaited directly without gather bookkeeping
+        if len(scanners) == 1:
+            await action(*scanners[0])
+        elif scanners:
+            await asyncio.gather(*(action(adapter, scanner) for adapter, scanner in scanners))
+
+    async def _wait_all_seen(self, timeout: float):
+        """
+        Wait for all devices already known at cycle start to advertise, for at most timeout seconds.
+        Waits the whole timeout when no device is known yet, to leave time for discovering them.
+        """
+        self._cycle_pending = set(self._known_mac)
+        self._all_seen.clear()
+        if not self._cycle_pending:
+            await asyncio.sleep(timeout)
+            return
+        try:
+            await asyncio.wait_for(self._all_seen.wait(), timeout)
+            logging.debug("%s: all known devices seen, ending scan window early", self._adapters)
+        except asyncio.TimeoutError:
+            pass
+        self._cycle_pending.clear()
 
     async def scan_loop(self):
         while True:
             if len(self._adapters) < 1:
-                logging.warn("Waiting for a bluetooth adapter...")
+                logging.warning("Waiting for a bluetooth adapter...")
                 await asyncio.sleep(5)
                 continue
-            scan_tasks = [asyncio.create_task(self._scan(adapter)) for adapter in self._adapters]
-            await asyncio.gather(*scan_tasks)
+            if len(self._scanners) < len(self._adapters):
+                self._create_scanners()
+
+            # Start scanners not running yet : first loop, after a pause or new adapter
+            await self._run_scanners(self._start_scan, [
+                (adapter, scanner) for adapter, scanner in self._scanners.items() if adapter not in self._scanning
+            ])
+            scan_start = asyncio.get_running_loop().time()
+            scan_window = self._dbus_ble_service.get_scan_window()
+            if self._dbus_ble_service.get_continuous_scan():
+                await asyncio.sleep(scan_window)
+            else:
+                await self._wait_all_seen(scan_window)
 
+            # Pause for the rest of the interval, scan window may have ended early
+            scan_pause = self._dbus_ble_service.get_scan_interval() - (asyncio.get_running_loop().time() - scan_start)
             if self._dbus_ble_service.get_continuous_scan():
-                logging.debug(f"{self._adapters}: continuous scan on, restarting scan immediately")
+                logging.debug("%s: continuous scan on, keeping scan running", self._adapters)
+            elif scan_pause <= 0:
+                logging.debug("%s: scan window covers scan interval, keeping scan running", self._adapters)
             else:
-                logging.debug(f"{self._adapters}: continuous scan off, pausing for {SCAN_SLEEP} seconds")
-                await asyncio.sleep(SCAN_SLEEP)
+                logging.debug("%s: continuous scan off, pausing for %.1f seconds", self._adapters, scan_pause)
+                await self._run_scanners(self._stop_scan, [
+                    (adapter, scanner) for adapter, scanner in self._scanners.items() if adapter in self._scanning
+                ])
+                if await self._dbus_ble_service.wait_continuous_scan(scan_pause):
+                    logging.debug("%s: continuous scan turned on, ending pause", self._adapters)
 
 
 def main():
@@ -172,6 +246,8 @@ def main():
         logging.getLogger("bleak").setLevel(logging.INFO)
 
     # Init gbulb, configure GLib and integrate asyncio in it
+    import gbulb
+    from dbus.mainloop.glib import DBusGMainLoop
     gbulb.install()
     DBusGMainLoop(set_as_default=True)
     asyncio.set_event_loop_policy(gbulb.GLibEventLoopPolicy())
@@ -1,9 +1,12 @@
 from __future__ import annotations
+import asyncio
 import logging
+import functools
 import sys
 import os
 import dbus
 from dbus_settings_service import DbusSettingsService
+from conf import SCAN_TIMEOUT, SCAN_INTERVAL_STANDARD, SCAN_TIMING_MAX
 from vedbus import VeDbusService, VeDbusItemImport, VeDbusItemExport
 
 
@@ -21,6 +24,10 @@ class DbusBleService(object):
 
         # Dbus local service, if needed
         self._dbus_ble_service: VeDbusService = None
+        # Dbus items, by raw path
+        self._path_cache: dict[str, VeDbusItemExport] = {}
+        # Set while continuous scan is on, to wake up paused scan
+        self._continuous_event = asyncio.Event()
 
         # List services
         dbus_iface_names = dbus.Interface(
@@ -30,12 +37,13 @@ class DbusBleService(object):
 
         # Check and create ble service
         if self._BLE_SERVICENAME in dbus_iface_names:
-            logging.critical(f"Service {self._BLE_SERVICENAME} already running, stop it and restart")
+            logging.critical("Service %s already running, stop it and restart", self._BLE_SERVICENAME)
             sys.exit(1)
 
-        logging.info(f"Creating dbus service {self._BLE_SERVICENAME} on bus {self._bus}")
+        logging.info("Creating dbus service %s on bus %s", self._BLE_SERVICENAME, self._bus)
         self._dbus_ble_service = VeDbusService(self._BLE_SERVICENAME, self._bus, False)
         self.init_continuous_scan()
+        self.init_scan_timings()
         self._dbus_ble_service.register()
 
         self.boolean = False
@@ -45,11 +53,16 @@ class DbusBleService(object):
         return DbusBleService._INSTANCE
 
     @staticmethod
+    @functools.lru_cache(maxsize=None)
     def _clear_path(path: str) -> str:
         return f"/{path.lstrip('/').rstrip('/')}"
 
     def _get_item(self, path: str) -> VeDbusItemExport:
-        return self._dbus_ble_service._dbusobjects.get(self._clear_path(path), None)
+        # Items are cached by raw path, to skip path cleaning on next accesses
+        if (item := self._path_cache.get(path, None)) is None:
+            if (item := self._dbus_ble_service._dbusobjects.get(self._clear_path(path), None)) is not None:
+                self._path_cache[path] = item
+        return item
 
     def _get_value(self, path: str) -> any:
         if (item := self._get_item(path)):
@@ -57,21 +70,26 @@ class DbusBleService(object):
         return None
 
     def _set_value(self, path: str, value: any):
+        # Unchanged value, no need for a service transaction
+        if (item := self._get_item(path)) is not None and item.local_get_value() == value:
+            return
         clean_path = self._clear_path(path)
         with self._dbus_ble_service as service:
-            if clean_path not in service:
-                logging.debug(f"Creating item {self._BLE_SERVICENAME}@{clean_path} to '{value}'")
+            if item is None:
+                logging.debug("Creating item %s@%s to '%s'", self._BLE_SERVICENAME, clean_path, value)
                 service.add_path(clean_path, value, writeable=True)
-            elif service[clean_path] != value:
-                logging.debug(f"Updating item {self._BLE_SERVICENAME}@{clean_path} to '{value}'")
+            else:
+                logging.debug("Updating item %s@%s to '%s'", self._BLE_SERVICENAME, clean_path, value)
                 service[clean_path] = value
 
     def _delete_item(self, path: str):
         clean_path = self._clear_path(path)
         if self._dbus_ble_service._dbusobjects.get(clean_path, None) is None:
-            logging.error(f"Can not delete unexisting {clean_path}")
+            logging.error("Can not delete unexisting %s", clean_path)
         else:
-            logging.debug(f"Deleting item {self._BLE_SERVICENAME}@{clean_path}")
+            logging.debug("Deleting item %s@%s", self._BLE_SERVICENAME, clean_path)
+            item = self._dbus_ble_service._dbusobjects[clean_path]
+            self._path_cache = {path: cached for path, cached in self._path_cache.items() if cached is not item}
             with self._dbus_ble_service as service:
                 del service[clean_path]
 
@@ -95,9 +113,8 @@ class DbusBleService(object):
             return 1
         self._dbus_ble_service._dbusobjects[item_path]._onchangecallback = _callback
 
-    def _init_proxy_setting(self, setting_path: str, item_path: str, default_value: any, min_value: int = 0, max_value: int = 0, callback=None):
-        logging.debug(
-            f"Creating setting '{setting_path}' proxy to '{item_path}' with: '{default_value}' '{min_value}' '{max_value}'")
+    def _init_proxy_setting(self, setting_path: str, item_path: str, default_value: any, min_value: int = 0, max_value: int = 0, callback=None, setting_callback=None):
+        logging.debug("Creating setting '%s' proxy to '%s' with: '%s' '%s' '%s'", setting_path, item_path, default_value, min_value, max_value)
         # Get or set setting
         setting_item = DbusSettingsService.get().get_item(setting_path, default_value, min_value, max_value)
 
@@ -105,8 +122,8 @@ class DbusBleService(object):
         item = self._set_value(item_path, setting_item.get_value())
         self.set_proxy_callback(item_path, setting_item, callback)
 
-        # Set settings callback
-        setting_item = DbusSettingsService.get().set_proxy_callback(setting_path, self._get_item(item_path))
+        # Set settings callback, setting_callback being called on changes made on settings side
+        setting_item = DbusSettingsService.get().set_proxy_callback(setting_path, self._get_item(item_path), setting_callback)
 
     def add_ble_adapter(self, name: str, mac: str):
         self._set_value(f"/Interfaces/{name}/Address", mac)
@@ -143,16 +160,73 @@ class DbusBleService(object):
         return False
 
     def init_continuous_scan(self):
-        def log(value):
-            logging.info(f"Continuous scanning set to '{value}'")
+        def on_change(value):
+            logging.info("Continuous scanning set to '%s'", value)
+            self._update_continuous_event(value)
         self._init_proxy_setting(
             '/Settings/BleSensors/ContinuousScan',
             '/ContinuousScan',
             0,
             0,
             1,
-            log
+            on_change,
+            on_change
         )
+        self._update_continuous_event(self._dbus_ble_service['/ContinuousScan'])
+
+    def _update_continuous_event(self, value):
+        if value:
+            self._continuous_event.set()
+        else:
+            self._continuous_event.clear()
 
     def get_continuous_scan(self) -> bool:
         return bool(self._dbus_ble_service['/ContinuousScan'])
+
+    async def wait_continuous_scan(self, timeout: float) -> bool:
+        """
+        Waits for at most timeout seconds for continuous scan to be on, returns True if it is.
+        """
+        # Item value is the reference, in case it was changed without notifying
+        self._update_continuous_event(self.get_continuous_scan())
+        try:
+            await asyncio.wait_for(self._continuous_event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def init_scan_timings(self):
+        def log_interval(value):
+            logging.info("Scan interval set to '%s' seconds", value)
+
+        def log_window(value):
+            logging.info("Scan window set to '%s' seconds", value)
+        self._init_proxy_setting(
+            '/Settings/BleSensors/ScanInterval',
+            '/ScanInterval',
+            SCAN_INTERVAL_STANDARD,
+            1,
+            SCAN_TIMING_MAX,
+            log_interval
+        )
+        self._init_proxy_setting(
+            '/Settings/BleSensors/ScanWindow',
+            '/ScanWindow',
+            SCAN_TIMEOUT,
+            1,
+            SCAN_TIMING_MAX,
+            log_window
+        )
+
+    def get_scan_interval(self) -> int:
+        """
+        Duration of a whole scan cycle, scan window included, when continuous scan is off.
+        Only times the scan loop, i.e. when scanners are started, the radio scan parameters are left to BlueZ.
+        """
+        return int(self._dbus_ble_service['/ScanInterval'])
+
+    def get_scan_window(self) -> int:
+        """
+        Duration the scanners run in each cycle, before being stopped for the rest of the interval
+        """
+        return int(self._dbus_ble_service['/ScanWindow'])
@@ -1,13 +1,43 @@
 import os
 import asyncio
 import logging
+import functools
 import dbus
+from contextlib import contextmanager
 from dbus_settings_service import DbusSettingsService
 from ble_role import BleRole
 from conf import PROCESS_NAME, PROCESS_VERSION, DBUS_ROLE_SERVICES_TIMEOUT
 from vedbus import VeDbusService, VeDbusItemImport, VeDbusItemExport
 
 
+class _ValuesSnapshot(object):
+    """
+    Read-through view of a role service values, given to alarm update methods in place of the role service.
+    Values are read once and shared between alarms, the view is reset when a value is changed through it.
+    Other attributes are those of the role service.
+    """
+    __slots__ = ('_role_service', '_values')
+
+    def __init__(self, role_service):
+        self._role_service = role_service
+        self._values = {}
+
+    def __getitem__(self, path: str) -> any:
+        try:
+            return self._values[path]
+        except KeyError:
+            value = self._values[path] = self._role_service._get_value(path)
+            return value
+
+    def __setitem__(self, path: str, new_value: any):
+        if self[path] != new_value:
+            self._role_service._set_value(path, new_value)
+            self._values.clear()
+
+    def __getattr__(self, name: str) -> any:
+        return getattr(self._role_service, name)
+
+
 class DbusRoleService(object):
     """
     Role service class. Responsible for holding and sharing data through a dedicated dbus service.
@@ -21,13 +51,17 @@ class DbusRoleService(object):
         self._ble_device = ble_device
         self.ble_role = ble_role
         self._dbus_service: VeDbusService = None  # Is velib_python good enough to be a parent class ?
+        self._path_cache: dict[str, VeDbusItemExport] = {}  # Dbus items, by raw path
+        self._batch_service = None  # velib service context of the ongoing batch, if any
+        self._alarm_input_cache: dict[str, tuple] = {}  # Alarm input values of last update, by alarm name
         self._dbus_service_timer = None
         self._service_name: str = None
         self._dbus_iface = dbus.Interface(
             self._bus.get_object('org.freedesktop.DBus', '/org/freedesktop/DBus'),
             'org.freedesktop.DBus')
+        self._role_name: str = self.ble_role.get_name()
         self._dev_id = self._ble_device.info['dev_id']
-        self._dbus_id = f"{self._dev_id}/{self.ble_role.get_name()}"
+        self._dbus_id = f"{self._dev_id}/{self._role_name}"
         self.init_service()
 
     def is_connected(self) -> bool:
@@ -41,7 +75,7 @@ class DbusRoleService(object):
     def _get_vrm_instance(self) -> int:
         # Try and get instance saved in settings
         if (dev_instance := DbusSettingsService.get().get_value(f"/Settings/Devices/{self._dbus_id}/VrmInstance")):
-            logging.info(f"{self._ble_device._plog} vrm instance {dev_instance} found for device {self._dbus_id}")
+            logging.info("%s vrm instance %s found for device %s", self._ble_device._plog, dev_instance, self._dbus_id)
             return dev_instance
 
         # Load devices from settings
@@ -49,29 +83,36 @@ class DbusRoleService(object):
         if not devices_string:
             return -1
 
-        # Filter existing ClassAndVrmInstance and get VrmInstance
-        role_name = self.ble_role.get_name()
-        existing_instances = set()
+        # Get highest instance used by the role, from ClassAndVrmInstance ('<role>:<instance>') and VrmInstance
+        role_name = self._role_name
+        cai_suffix = '/ClassAndVrmInstance'
+        vrm_suffix = f"/{role_name}/VrmInstance"
+        max_instance = int(self.ble_role.info['dev_instance']) - 1
         for key, value in devices_string.items():
-            if '/ClassAndVrmInstance' in key and value.startswith(role_name):
-                existing_instances.add(int(value[len(role_name) + 1:]))
-            elif f"{role_name}/VrmInstance" in key:
-                existing_instances.add(int(value))
-
-        # Increment instance until free one found
-        cur_instance = int(self.ble_role.info['dev_instance'])
-        while cur_instance in existing_instances:
-            cur_instance += 1
+            if key.endswith(cai_suffix):
+                value_role, _, value_instance = value.partition(':')
+                if value_role != role_name:
+                    continue
+                instance = int(value_instance)
+            elif key.endswith(vrm_suffix):
+                instance = int(value)
+            else:
+                continue
+            if instance > max_instance:
+                max_instance = instance
+
+        # Next one is free, and not lower than role base instance
+        cur_instance = max_instance + 1
 
         # Save instance in settings
-        logging.info(f"{self._ble_device._plog} assigning vrm instance {cur_instance} for role {role_name}")
+        logging.info("%s assigning vrm instance %s for role %s", self._ble_device._plog, cur_instance, role_name)
         DbusSettingsService.get().set_item(f"/Settings/Devices/{self._dbus_id}/VrmInstance", cur_instance)
         return cur_instance
 
     def init_service(self):
-        self._service_name = f"com.victronenergy.{self.ble_role.get_name()}.{self._dev_id}"
+        self._service_name = f"com.victronenergy.{self._role_name}.{self._dev_id}"
 
-        logging.debug(f"{self._ble_device._plog} initializing dbus '{self._service_name}'")
+        logging.debug("%s initializing dbus '%s'", self._ble_device._plog, self._service_name)
         self._dbus_service = VeDbusService(self._service_name, self._bus, False)
 
         # Add mandatory data
@@ -79,10 +120,11 @@ class DbusRoleService(object):
         self._dbus_service.add_path('/Mgmt/ProcessVersion', PROCESS_VERSION)
         self._dbus_service.add_path('/Mgmt/Connection', "Bluetooth LE")
         # Device instance will be set at connection to avoid conflicts
-        self._dbus_service.add_path('/ProductId', self._ble_device.info['product_id'])
-        self._dbus_service.add_path('/ProductName', self._ble_device.info['product_name'])
-        self._dbus_service.add_path('/FirmwareVersion', self._ble_device.info['firmware_version'])
-        self._dbus_service.add_path('/HardwareVersion', self._ble_device.info['hardware_version'])
+        info = self._ble_device.info
+        self._dbus_service.add_path('/ProductId', info['product_id'])
+        self._dbus_service.add_path('/ProductName', info['product_name'])
+        self._dbus_service.add_path('/FirmwareVersion', info['firmware_version'])
+        self._dbus_service.add_path('/HardwareVersion', info['hardware_version'])
         self._dbus_service.add_path('/Connected', 1, writeable=True)
         self._dbus_service.add_path('/Status', 0, writeable=True)
 
@@ -94,51 +136,102 @@ class DbusRoleService(object):
             if not self._get_value('/DeviceInstance'):
                 self._set_value('/DeviceInstance', self._get_vrm_instance())
 
-            logging.info(f"{self._ble_device._plog} registrating '{self._service_name}' dbus service on bus {self._bus}")
+            logging.info("%s registrating '%s' dbus service on bus %s", self._ble_device._plog, self._service_name, self._bus)
             self._dbus_service.register()
         self._dbus_service_timer = asyncio.create_task(self._connection_timeout())
 
     def disconnect(self):
         if not self.is_connected():
             return
-        logging.info(f"{self._ble_device._plog} releasing '{self._service_name}' dbus service")
+        logging.info("%s releasing '%s' dbus service", self._ble_device._plog, self._service_name)
         self._dbus_service._dbusname.__del__()
         self._dbus_service._dbusname = None
 
     async def _connection_timeout(self):
         await asyncio.sleep(DBUS_ROLE_SERVICES_TIMEOUT)
         logging.warning(
-            f"{self._ble_device._plog} no data received since {DBUS_ROLE_SERVICES_TIMEOUT} seconds, disconnecting dbus service")
+            "%s no data received since %s seconds, disconnecting dbus service", self._ble_device._plog, DBUS_ROLE_SERVICES_TIMEOUT)
         self.disconnect()
 
     @staticmethod
+    @functools.lru_cache(maxsize=None)
     def _clear_path(path: str) -> str:
         return f"/{path.lstrip('/').rstrip('/')}"
 
     def _get_item(self, path: str) -> VeDbusItemExport:
-        return self._dbus_service._dbusobjects.get(self._clear_path(path), None)
+        # Items are cached by raw path, to skip path cleaning on next accesses
+        if (item := self._path_cache.get(path, None)) is None:
+            if (item := self._dbus_service._dbusobjects.get(self._clear_path(path), None)) is not None:
+                self._path_cache[path] = item
+        return item
 
     def _get_value(self, path: str) -> any:
         if (item := self._get_item(path)):
             return item.local_get_value()
         return None
 
+    def _write_value(self, service, path: str, value: any):
+        if (item := self._get_item(path)) is None:
+            clean_path = self._clear_path(path)
+            logging.debug("%s creating item %s@%s to %s", self._ble_device._plog, self._service_name, clean_path, value)
+            service.add_path(clean_path, value, writeable=True)
+        elif item.local_get_value() != value:
+            clean_path = self._clear_path(path)
+            logging.debug("%s setting item %s@%s to %s", self._ble_device._plog, self._service_name, clean_path, value)
+            service[clean_path] = value
+
     def _set_value(self, path: str, value: any):
-        clean_path = self._clear_path(path)
+        # Unchanged value, no need for a service transaction
+        if (item := self._get_item(path)) is not None and item.local_get_value() == value:
+            return
+        if (service := self._batch_service) is not None:
+            self._write_value(service, path, value)
+        else:
+            with self._dbus_service as service:
+                self._write_value(service, path, value)
+
+    @contextmanager
+    def batch(self):
+        """
+        Groups items changes made within the context in a single service transaction, so that they are signaled
+        together when leaving it. Values are set immediately, reading them within the context is consistent.
+        """
+        if self._batch_service is not None:
+            # Nested batch, changes are signaled by the outer one
+            yield
+            return
         with self._dbus_service as service:
-            if clean_path not in service:
-                logging.debug(f"{self._ble_device._plog} setting item {self._service_name}@{clean_path} to {value}")
-                service.add_path(clean_path, value, writeable=True)
-            elif service[clean_path] != value:
-                logging.debug(f"{self._ble_device._plog} creating item {self._service_name}@{clean_path} to {value}")
-                service[clean_path] = value
+            self._batch_service = service
+            try:
+                yield
+            finally:
+                self._batch_service = None
+
+    def register_batch(self, registrations):
+        """
+        Runs registration callables, i.e. items, settings and alarms creation, in a single service transaction.
+        """
+        with self.batch():
+            for registration in registrations:
+                registration()
+
+    def update(self, data: dict):
+        """
+        Sets several items at once, in a single service transaction so that their changes are signaled together.
+        """
+        with self.batch():
+            service = self._batch_service
+            for path, value in data.items():
+                self._write_value(service, path, value)
 
     def _delete_item(self, path: str):
         clean_path = self._clear_path(path)
         if self._dbus_service._dbusobjects.get(clean_path, None) is None:
-            logging.error(f"Can not delete unexisting {clean_path}")
+            logging.error("Can not delete unexisting %s", clean_path)
         else:
-            logging.debug(f"Deleting item {self._service_name}@{clean_path}")
+            logging.debug("Deleting item %s@%s", self._service_name, clean_path)
+            item = self._dbus_service._dbusobjects[clean_path]
+            self._path_cache = {path: cached for path, cached in self._path_cache.items() if cached is not item}
             with self._dbus_service as service:
                 del service[clean_path]
 
@@ -164,7 +257,7 @@ class DbusRoleService(object):
 
     def _init_proxy_setting(self, setting_path: str, item_path: str, default_value: any, min_value: int = 0, max_value: int = 0, callback=None):
         logging.debug(
-            f"Creating setting '{setting_path}' proxy to '{item_path}' with: '{default_value}' '{min_value}' '{max_value}' '{callback}'")
+            "Creating setting '%s' proxy to '%s' with: '%s' '%s' '%s' '%s'", setting_path, item_path, default_value, min_value, max_value, callback)
         # Get or set setting
         setting_item = DbusSettingsService.get().get_item(setting_path, default_value, min_value, max_value)
 
@@ -212,6 +305,18 @@ class DbusRoleService(object):
     def add_alarm(self, alarm: dict):
         self._set_value(alarm['name'], 0)
 
-    def update_alarm(self, alarm: dict):
-        alarm_state = alarm['update'](self)
-        self._set_value(alarm['name'], alarm_state)
+    def update_alarms(self, alarms):
+        """
+        Updates alarm states, in order, in a single service transaction.
+        Update methods get a snapshot of the service values, so that values used by several alarms are read once.
+        Alarms declaring their 'inputs' are skipped when none of them changed since last update.
+        """
+        snapshot = _ValuesSnapshot(self)
+        with self.batch():
+            for alarm in alarms:
+                if (inputs := alarm.get('inputs', None)) is not None:
+                    input_values = tuple(snapshot[path] for path in inputs)
+                    if self._alarm_input_cache.get(alarm['name'], None) == input_values:
+                        continue
+                    self._alarm_input_cache[alarm['name']] = input_values
+                snapshot[alarm['name']] = alarm['update'](snapshot)
@@ -35,7 +35,7 @@ class DbusSettingsService(object):
         if (item := self._paths.get(path, None)) is None:
             item = VeDbusItemImport(self._bus, self._SETTINGS_SERVICENAME, path)
             if not item.exists and def_value is not None:
-                item = self.set_item(path, def_value, def_value, max_value)
+                item = self.set_item(path, def_value, min_value, max_value)
             self._paths[path] = item
         return item
 
@@ -69,10 +69,10 @@ class DbusSettingsService(object):
 
     def set_value(self, path, new_value):
         if (setting := self._paths.get(path, None)) is None:
-            logging.error(f"Can not set value of unexisting {path} to {new_value}.")
+            logging.error("Can not set value of unexisting %s to %s.", path, new_value)
         else:
             if (result := setting.set_value(new_value)) != 0:
-                logging.error(f"Failed to set setting {path} to {new_value}, result={result}.")
+                logging.error("Failed to set setting %s to %s, result=%s.", path, new_value, result)
 
     def set_event_callback(self, path, callback):
         item = self.get_item(path)
@@ -83,13 +83,15 @@ class DbusSettingsService(object):
         else:
             item.eventCallback = callback
 
-    def set_proxy_callback(self, setting_path: str, remote_item: VeDbusItemExport):
+    def set_proxy_callback(self, setting_path: str, remote_item: VeDbusItemExport, callback=None):
         def _callback(service_name, change_path, changes):
             if service_name != DbusSettingsService._SETTINGS_SERVICENAME or change_path != setting_path:
                 return
             new_value = changes['Value']
             if new_value != remote_item.local_get_value():
                 remote_item.local_set_value(new_value)
+                if callback:
+                    callback(new_value)
         self.set_event_callback(setting_path, _callback)
 
     def __getitem__(self, path):
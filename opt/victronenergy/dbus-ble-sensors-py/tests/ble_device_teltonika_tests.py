@@ -3,13 +3,20 @@ import os
 sys.path.insert(1, os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(1, os.path.join(os.path.dirname(__file__), '..', 'ext'))
 sys.path.insert(1, os.path.join(os.path.dirname(__file__), '..', 'ext', 'velib_python'))
+import dbus
 from ble_device_teltonika import BleDeviceTeltonika
+from ble_role import BleRole
 import unittest
 
 
 class BleDeviceTeltonikaTest(unittest.TestCase):
     # To be executed with command : python3 -m unittest ble_device_teltonika_tests.py
 
+    @classmethod
+    def setUpClass(cls):
+        # Roles are needed to check configurations
+        BleRole.load_instances(os.path.join(os.path.dirname(__file__), '..', 'ble_role.py'))
+
     def setUp(self):
         self.device = BleDeviceTeltonika('7cd9f411427d', 'PITCH_ROLL')
         self.maxDiff = None  # See full comparison on failures
@@ -143,3 +150,75 @@ class BleDeviceTeltonikaTest(unittest.TestCase):
         # M=4D: Battery voltage: 4D=77, 2000 + (77 * 10) = 2770mV
         expected_dict = {}  # No roles...
         self._test_parsing(raw_data, expected_dict)
+
+    def test_roles_order(self):
+        # Roles are kept in flags order, without duplicates
+        self.device.configure(b'\x01\xb7\x08\xb4\x12\x0c\xcb\x0b\xff\xc7\x67')
+        self.assertListEqual(self.device.info['roles'], ['digitalinput', 'temperature', 'movement'])
+
+    def test_double_without_bits(self):
+        # Double has no default length, 'bits' is mandatory
+        self.device.configure(b'\x01\x8C\x67')
+        self.device._check_configuration()
+        self.device.info['regs'].append({'name': 'Double', 'type': dbus.types.Double, 'offset': 0, 'shift': 2})
+        with self.assertRaisesRegex(ValueError, "missing 'bits'"):
+            self.device._check_configuration()
+
+    def test_invalid_configuration_keeps_regs(self):
+        # An invalid configuration is rejected without compiling its regs
+        raw_data = b'\x01\x8C\x67'
+        self.device.configure(raw_data)
+        self.device._check_configuration()
+        compiled_regs = self.device._compiled_regs
+        self.device.info['regs'].append({'name': 'Broken', 'type': dbus.types.Byte, 'offset': None})
+        with self.assertRaisesRegex(ValueError, "'offset' in reg Broken must be an integer"):
+            self.device._check_configuration()
+        self.assertIs(self.device._compiled_regs, compiled_regs)
+        self.device.info['regs'][-1].update({'offset': 0, 'shift': '2'})
+        with self.assertRaisesRegex(ValueError, "'shift' in reg Broken must be an integer"):
+            self.device._check_configuration()
+        self.assertIs(self.device._compiled_regs, compiled_regs)
+
+        # Settings and alarms are checked before compiling regs too
+        self.device.info['regs'][-1]['shift'] = 2
+        self.device.info['alarms'].append({'name': 'Broken'})
+        with self.assertRaisesRegex(ValueError, "Missing key 'update' in alarm Broken"):
+            self.device._check_configuration()
+        self.assertIs(self.device._compiled_regs, compiled_regs)
+
+    def test_unknown_flag(self):
+        self.device.configure(b'\x01\x8C\x67')
+        self.device.info['regs'].append({'name': 'Flagged', 'type': dbus.types.Byte, 'offset': 2, 'flags': ['REG_FLAG_UNKNOWN']})
+        with self.assertRaisesRegex(ValueError, 'Unknown flags'):
+            self.device._check_configuration()
+
+    def test_zero_scale(self):
+        self.device.configure(b'\x01\x8C\x67')
+        self.device.info['regs'].append({'name': 'Scaled', 'type': dbus.types.Byte, 'offset': 2, 'scale': 0})
+        with self.assertRaisesRegex(ValueError, "'scale'"):
+            self.device._check_configuration()
+
+    def test_big_endian_bit(self):
+        # Single bit of a big endian multi-byte field, read directly from its byte, gives the same value as the
+        # generic parsing, forced here with a null bias
+        bit_reg = {'name': 'Bit', 'type': dbus.types.Boolean, 'offset': 1, 'bits': 1, 'shift': 11, 'flags': ['REG_FLAG_BIG_ENDIAN']}
+        self.device.configure(b'\x01\x8C\x67')
+        self.device.info['regs'] = [bit_reg, dict(bit_reg, name='Generic', bias=0)]
+        self.device._compile_regs()
+        for raw_data, expected in ((b'\x00\x08\x00', True), (b'\x00\xf7\xff', False), (b'\x00\x00\x08', False)):
+            self.assertDictEqual(self.device._parse_manufacturer_data(raw_data), {'digitalinput': {'Bit': expected, 'Generic': expected}})
+
+    def test_same_name_for_two_roles(self):
+        # Regs of different roles can share a name, each role gets its own value
+        self.device.configure(b'\x01\xb7\x08\xb4\x12\x0c\xcb\x0b\xff\xc7\x67')
+        self.device.info['roles'] = ['temperature', 'movement']
+        self.device.info['regs'] = [
+            {'name': 'Temperature', 'type': dbus.types.Byte, 'offset': 0, 'roles': ['temperature']},
+            {'name': 'Temperature', 'type': dbus.types.Byte, 'offset': 1, 'roles': ['movement']},
+            {'name': 'Shared', 'type': dbus.types.Byte, 'offset': 2},
+        ]
+        self.device._check_configuration()
+        self.assertDictEqual(self.device._parse_manufacturer_data(b'\x01\x02\x03'), {
+            'temperature': {'Temperature': 1, 'Shared': 3},
+            'movement': {'Temperature': 2, 'Shared': 3}
+        })